@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set
+import json
+import os
+
+
+class CheckpointStore:
+    """Append-only checkpoint log for workflow runs.
+
+    Every checkpoint is a single JSON line appended to ``path``; finishing a
+    run appends a tombstone. Replaying the file keeps the last state for each
+    run. Once the log holds ``compact_ratio`` times more records than live
+    runs it is rewritten with only the live states, so steady-state writes
+    stay one small append per node.
+    """
+
+    def __init__(self, path: Path, compact_ratio: int = 4, min_records: int = 1000):
+        self.path = Path(path)
+        self.compact_ratio = compact_ratio
+        self.min_records = min_records
+        self._live: Set[str] = set()
+        self._records = 0
+        self._fh = None
+
+    def _records_on_disk(self) -> Iterator[Dict[str, Any]]:
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn write at the tail of the log; nothing after it is valid
+                    break
+
+    def _replay(self) -> Dict[str, Dict[str, Any]]:
+        states: Dict[str, Dict[str, Any]] = {}
+        records = 0
+        for record in self._records_on_disk():
+            records += 1
+            if "done" in record:
+                states.pop(record["done"], None)
+            elif "run" in record:
+                states[record["run"]["id"]] = record["run"]
+        self._records = records
+        return states
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return the latest checkpointed state of every unfinished run."""
+        self.close()
+        states = self._replay()
+        self._live = set(states)
+        return states
+
+    def save(self, state: Dict[str, Any]) -> None:
+        self.save_many([state])
+
+    def save_many(self, states: List[Dict[str, Any]]) -> None:
+        """Checkpoint several runs with a single write."""
+        self._live.update(state["id"] for state in states)
+        self._append([{"run": state} for state in states])
+
+    def discard(self, run_id: str) -> None:
+        if run_id not in self._live:
+            return
+        self._live.discard(run_id)
+        self._append([{"done": run_id}])
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = self.path.open("a", encoding="utf-8")
+        self._fh.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+        self._fh.flush()
+        self._records += len(records)
+        if self._records >= max(self.min_records, self.compact_ratio * len(self._live)):
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log keeping only the latest state of live runs."""
+        self.close()
+        states = self._replay()
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as fh:
+            for state in states.values():
+                fh.write(json.dumps({"run": state}, default=str) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        self._live = set(states)
+        self._records = len(states)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
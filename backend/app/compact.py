@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Tuple
+import sys
+
+from .serialization import dumps, loads
+
+_EMPTY_PARAMS = b"{}"
+# JSON-encoded node types; there are only a handful, so encode each once
+_TYPE_JSON: Dict[str, bytes] = {}
+
+
+class CompactNode:
+    """Immutable, slotted node used by the in-memory workflow store.
+
+    ``type`` is interned so thousands of nodes share one string, and
+    ``params`` is kept as its JSON encoding and only decoded when read.
+    Each read returns a fresh dict, so callers can't mutate a stored node.
+    """
+
+    __slots__ = ("id", "type", "_params")
+
+    def __init__(self, id: str, type: str, params: bytes = _EMPTY_PARAMS):
+        self.id = id
+        self.type = sys.intern(type)
+        self._params = params
+
+    @classmethod
+    def from_params(cls, id: str, type: str, params: Dict[str, Any]) -> "CompactNode":
+        if not params:
+            return cls(id, type)
+        # copy into an exact-size buffer; orjson over-allocates its output,
+        # which adds up when the bytes are kept for every node
+        return cls(id, type, bytes(memoryview(dumps(params))))
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        if self._params == _EMPTY_PARAMS:
+            return {}
+        return loads(self._params)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "type": self.type, "params": self.params}
+
+    def to_json(self) -> bytes:
+        type_json = _TYPE_JSON.get(self.type)
+        if type_json is None:
+            type_json = _TYPE_JSON[self.type] = dumps(self.type)
+        # params are already encoded, so splice them in instead of re-encoding
+        return b'{"id":%b,"type":%b,"params":%b}' % (dumps(self.id), type_json, self._params)
+
+
+class CompactWorkflow:
+    """Immutable version of a workflow made of ``CompactNode`` objects.
+
+    Versions derived from each other share their unchanged nodes.
+    """
+
+    __slots__ = ("id", "name", "nodes", "version")
+
+    def __init__(
+        self, id: str, name: str, nodes: Iterable[CompactNode], version: int = 1
+    ):
+        self.id = id
+        self.name = name
+        self.nodes: Tuple[CompactNode, ...] = tuple(nodes)
+        self.version = version
+
+    @classmethod
+    def from_model(cls, workflow: Any, version: int = 1) -> "CompactWorkflow":
+        """Build from a pydantic ``Workflow`` (or anything shaped like one)."""
+        return cls(
+            workflow.id,
+            workflow.name,
+            (CompactNode.from_params(n.id, n.type, n.params) for n in workflow.nodes),
+            version,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "nodes": [node.to_dict() for node in self.nodes],
+        }
+
+    def to_json(self) -> bytes:
+        return (
+            b'{"id":' + dumps(self.id)
+            + b',"name":' + dumps(self.name)
+            + b',"nodes":[' + b",".join(node.to_json() for node in self.nodes)
+            + b"]}"
+        )
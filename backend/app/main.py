@@ -1,25 +1,52 @@
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, APIRouter
+from fastapi import Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from fastapi import Depends
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import json
+from pydantic import BaseModel, PrivateAttr, ValidationError
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Dict, Any, Literal, Optional, Set, Tuple, Union
+from collections import OrderedDict, deque
+from contextvars import ContextVar
 from pathlib import Path
 import asyncio
+import bisect
+import itertools
+import logging
 import os
-
-from .nodes import NODE_REGISTRY
+import time
+import uuid
+
+from .nodes import NODE_REGISTRY, SubworkflowNode, SuspendRun
+from .timers import TimerScheduler
+from .checkpoints import CheckpointStore
+from .serialization import dumps
+from .compact import CompactNode, CompactWorkflow
+from .patch import PatchError, apply_patch
+from .scheduler import FairQueue, QueueFull
+from .runlogs import RunLog, RunLogStore
 
 from .agents import AGENTS, BaseAgent
 
+logger = logging.getLogger(__name__)
+
 API_KEY = os.getenv("NEXUS_API_KEY", "testtoken")
+# "tenant=key,..." keys that authenticate as a single tenant
+TENANT_KEYS = {
+    key.strip(): tenant.strip()
+    for tenant, _, key in (
+        item.partition("=") for item in os.getenv("TENANT_API_KEYS", "").split(",")
+    )
+    if tenant.strip() and key.strip()
+}
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
 
 async def get_api_key(api_key: str | None = Depends(api_key_header)):
     if api_key == f"Bearer {API_KEY}":
         return api_key
+    if api_key and api_key.startswith("Bearer ") and api_key[7:] in TENANT_KEYS:
+        return api_key
     raise HTTPException(status_code=401, detail="Unauthorized")
 
 app = FastAPI(title="NEXUS AI Backend")
@@ -59,34 +86,311 @@ class Workflow(BaseModel):
     nodes: List[Node]
 
 
+class WorkflowSummary(BaseModel):
+    id: str
+    name: str
+    node_count: int
+    version: int
+    updated_at: float
+
+
+class PatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace", "test"]
+    path: str
+    value: Any = None
+
+
+class WorkflowPatch(BaseModel):
+    version: int
+    operations: List[PatchOperation]
+
+
+class RunRequest(BaseModel):
+    workflow_id: str
+    priority: int = 0
+    timeout: Optional[float] = None
+
+
 class Suggestion(BaseModel):
     message: str
     node_id: Optional[str] = None
 
 
-WORKFLOWS: Dict[str, Workflow] = {}
+class Run(BaseModel):
+    id: str
+    workflow_id: str
+    status: str = "queued"
+    position: int = 0
+    context: Dict[str, Any] = {}
+    wake_at: Optional[float] = None
+    deadline: Optional[float] = None
+    tenant: str = "default"
+    priority: int = 0
+    _logs: Optional[RunLog] = PrivateAttr(None)
+
+    @property
+    def logs(self) -> RunLog:
+        """The run's log on disk, picking up lines written before a restart."""
+        if self._logs is None:
+            self._logs = RUN_LOGS.open(self.id)
+        return self._logs
+
+
+# workflows are validated as pydantic models at the API boundary and stored
+# compacted; see app/compact.py
+WORKFLOWS: Dict[str, CompactWorkflow] = {}
 DATA_DIR = Path(__file__).resolve().parent / ".." / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# (revision, updated_at) per workflow; revisions come from one global counter
+# so a deleted and re-created workflow never reuses an ETag
+WORKFLOW_META: Dict[str, tuple] = {}
+_REVISIONS = itertools.count(1)
+WORKFLOWS_REVISION = 0
+_SORTED_IDS: tuple = (None, [])
+
+# LRU of serialized workflow JSON keyed by id; each entry remembers the
+# workflow object it was built from so a replaced workflow is never served stale
+SERIALIZED_CACHE_SIZE = int(os.getenv("SERIALIZED_CACHE_SIZE", "10000"))
+SERIALIZED: "OrderedDict[str, tuple]" = OrderedDict()
+
+# recent (workflow, updated_at) versions per id; versions share unchanged nodes
+MAX_WORKFLOW_VERSIONS = int(os.getenv("MAX_WORKFLOW_VERSIONS", "20"))
+WORKFLOW_HISTORY: Dict[str, deque] = {}
+
+
+def touch_workflow(workflow_id: str, deleted: bool = False):
+    global WORKFLOWS_REVISION
+    WORKFLOWS_REVISION = next(_REVISIONS)
+    SERIALIZED.pop(workflow_id, None)
+    if deleted:
+        WORKFLOW_META.pop(workflow_id, None)
+    else:
+        WORKFLOW_META[workflow_id] = (WORKFLOWS_REVISION, time.time())
+
+
+def store_workflow(workflow: CompactWorkflow) -> CompactWorkflow:
+    """Make ``workflow`` the current version of its id and record it in the history."""
+    previous = WORKFLOWS.get(workflow.id)
+    workflow.version = previous.version + 1 if previous is not None else 1
+    WORKFLOWS[workflow.id] = workflow
+    touch_workflow(workflow.id)
+    history = WORKFLOW_HISTORY.get(workflow.id)
+    if history is None:
+        history = WORKFLOW_HISTORY[workflow.id] = deque(maxlen=MAX_WORKFLOW_VERSIONS)
+    history.append((workflow, WORKFLOW_META[workflow.id][1]))
+    return workflow
+
+
+def workflow_meta(workflow_id: str) -> tuple:
+    if workflow_id not in WORKFLOW_META:
+        # stored without going through the API; reads must not bump the list ETag
+        WORKFLOW_META[workflow_id] = (next(_REVISIONS), time.time())
+    return WORKFLOW_META[workflow_id]
+
+
+def workflow_bytes(workflow_id: str) -> bytes:
+    """Serialized JSON of a stored workflow, built once per version."""
+    workflow = WORKFLOWS[workflow_id]
+    cached = SERIALIZED.get(workflow_id)
+    if cached is not None and cached[0] is workflow:
+        SERIALIZED.move_to_end(workflow_id)
+        return cached[1]
+    data = workflow.to_json()
+    SERIALIZED[workflow_id] = (workflow, data)
+    if len(SERIALIZED) > SERIALIZED_CACHE_SIZE:
+        SERIALIZED.popitem(last=False)
+    return data
+
+
+def json_response(content: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def sorted_workflow_ids() -> List[str]:
+    """Workflow ids in cursor order, re-sorted only after the store changes."""
+    global _SORTED_IDS
+    key = (WORKFLOWS_REVISION, len(WORKFLOWS))
+    if _SORTED_IDS[0] != key:
+        _SORTED_IDS = (key, sorted(WORKFLOWS))
+    return _SORTED_IDS[1]
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag.removeprefix("W/") in tags
+
 # --- Auto-scaling Execution Queue ---
 MIN_WORKERS = int(os.getenv("MIN_WORKERS", "1"))
 MAX_WORKERS = int(os.getenv("MAX_WORKERS", "5"))
-WORKFLOW_QUEUE: asyncio.Queue[str] = asyncio.Queue()
+# default per-run deadline in seconds; 0 disables it
+RUN_TIMEOUT = float(os.getenv("RUN_TIMEOUT", "0"))
+# max queued runs per tenant (0 = unlimited) and "tenant=weight,..." shares
+MAX_TENANT_QUEUE = int(os.getenv("MAX_TENANT_QUEUE", "0"))
+TENANT_WEIGHTS = {
+    name.strip(): float(weight)
+    for name, _, weight in (
+        item.partition("=") for item in os.getenv("TENANT_WEIGHTS", "").split(",")
+    )
+    if name.strip() and weight
+}
+# tenants the shared API key may queue runs for through X-Tenant-ID
+TENANTS = {name.strip() for name in os.getenv("TENANTS", "").split(",") if name.strip()}
+WORKFLOW_QUEUE = FairQueue(MAX_TENANT_QUEUE, TENANT_WEIGHTS)
 WORKERS: List[asyncio.Task] = []
+RUNS: Dict[str, Run] = {}
+# finished runs stay in RUNS for status lookups, oldest evicted first
+MAX_FINISHED_RUNS = int(os.getenv("MAX_FINISHED_RUNS", "10000"))
+FINISHED_RUNS: Deque[str] = deque()
+RUN_TASKS: Dict[str, asyncio.Task] = {}
+FINISHED_STATUSES = ("completed", "failed", "cancelled", "timed_out")
+RUN_STATS: Dict[str, int] = {status: 0 for status in FINISHED_STATUSES}
+CHECKPOINTS = CheckpointStore(
+    Path(os.getenv("NEXUS_CHECKPOINT_PATH", str(DATA_DIR / "runs.ckpt")))
+)
+# run logs live on disk; logs of runs that are not in progress are deleted
+# once untouched for RUN_LOG_RETENTION seconds (0 keeps them forever)
+RUN_LOGS = RunLogStore(
+    Path(os.getenv("NEXUS_RUN_LOG_PATH", str(DATA_DIR / "logs"))),
+    segment_bytes=int(os.getenv("RUN_LOG_SEGMENT_BYTES", str(4 << 20))),
+    max_segments=int(os.getenv("RUN_LOG_MAX_SEGMENTS", "0")),
+    retention=float(os.getenv("RUN_LOG_RETENTION", str(7 * 24 * 3600))),
+)
+MAX_LOG_PAGE = 10_000
+
+
+def checkpoint(run: Run):
+    if run.status in FINISHED_STATUSES:
+        CHECKPOINTS.discard(run.id)
+    else:
+        CHECKPOINTS.save(run.model_dump())
+
+
+def finish_run(run: Run, status: str):
+    run.status = status
+    run.wake_at = None
+    TIMERS.cancel(run.id)
+    RUN_STATS[status] += 1
+    checkpoint(run)
+    run.logs.close()
+    FINISHED_RUNS.append(run.id)
+    while len(FINISHED_RUNS) > MAX_FINISHED_RUNS:
+        old = RUNS.get(FINISHED_RUNS.popleft())
+        if old is not None and old.status in FINISHED_STATUSES:
+            del RUNS[old.id]
+
+
+def arm_timer(run: Run):
+    """Park a waiting run until its wake time, or its deadline if sooner."""
+    when = run.wake_at
+    if run.deadline is not None:
+        when = min(when, run.deadline)
+    TIMERS.schedule(run.id, when)
+
+
+def requeue(run: Run):
+    """Put an already admitted run back on the queue, bypassing tenant limits."""
+    run.status = "queued"
+    WORKFLOW_QUEUE.put_nowait(run.id, run.tenant, run.priority, force=True)
+
+
+def read_workflow_file(workflow_id: str) -> Optional[CompactWorkflow]:
+    path = DATA_DIR / f"{workflow_id}.json"
+    if not path.exists():
+        return None
+    return CompactWorkflow.from_model(Workflow.model_validate_json(path.read_bytes()))
+
+
+async def wake_run(run_id: str):
+    run = RUNS.get(run_id)
+    if run is None or run.status != "waiting":
+        return
+    run.wake_at = None
+    requeue(run)
+    await scale_workers()
+
+
+TIMERS = TimerScheduler(wake_run)
+
+# Workflows on the current task's call stack: the run's own workflow and any
+# subworkflows it is inside. Guards against cycles introduced after
+# validation, e.g. by a later PATCH of the callee.
+SUBWORKFLOW_STACK: ContextVar[Tuple[str, ...]] = ContextVar("SUBWORKFLOW_STACK", default=())
+
+
+async def run_workflow(run: Run):
+    """Execute a queued run from its current position.
+
+    Long delays raise ``SuspendRun``; the run is then parked on ``TIMERS``
+    and the worker is released until the timer re-queues it.
+    """
+    workflow = WORKFLOWS.get(run.workflow_id)
+    if workflow is None:
+        await log(f"Workflow not found: {run.workflow_id}", run.logs)
+        finish_run(run, "failed")
+        return
+    run.status = "running"
+    SUBWORKFLOW_STACK.set((run.workflow_id,))
+    while run.position < len(workflow.nodes):
+        node = workflow.nodes[run.position]
+        try:
+            await execute_node(node, run.logs, run.context)
+        except SuspendRun as exc:
+            run.position += 1
+            run.status = "waiting"
+            run.wake_at = time.time() + exc.delay
+            arm_timer(run)
+            checkpoint(run)
+            return
+        run.position += 1
+        if run.position < len(workflow.nodes):
+            checkpoint(run)
+            # let cancellation and other runs in between nodes
+            await asyncio.sleep(0)
+    finish_run(run, "completed")
+
+
+async def execute_run(run: Run):
+    """Run ``run`` in its own task so it can be cancelled or timed out."""
+    remaining = None if run.deadline is None else run.deadline - time.time()
+    if remaining is not None and remaining <= 0:
+        finish_run(run, "timed_out")
+        return
+    task = asyncio.create_task(run_workflow(run))
+    RUN_TASKS[run.id] = task
+    try:
+        await asyncio.wait_for(task, remaining)
+    except asyncio.TimeoutError:
+        await log("Run timed out", run.logs)
+        finish_run(run, "timed_out")
+    except asyncio.CancelledError:
+        if run.status != "cancelled":
+            # the worker itself is being cancelled
+            raise
+        finish_run(run, "cancelled")
+    except Exception as e:
+        if run.status in FINISHED_STATUSES:
+            # cancelled after the task had already failed
+            return
+        await log(f"Run failed: {e}", run.logs)
+        finish_run(run, "failed")
+    finally:
+        RUN_TASKS.pop(run.id, None)
 
 
 async def worker():
     while True:
-        workflow_id = await WORKFLOW_QUEUE.get()
-        try:
-            workflow = WORKFLOWS.get(workflow_id)
-            if workflow:
-                logs: List[str] = []
-                context: Dict[str, Any] = {}
-                for node in workflow.nodes:
-                    await execute_node(node, logs, context)
-        finally:
-            WORKFLOW_QUEUE.task_done()
+        run_id = await WORKFLOW_QUEUE.get()
+        run = RUNS.get(run_id)
+        # runs evicted or cancelled after being dequeued are skipped
+        if run is not None and run.status == "queued":
+            await execute_run(run)
 
 
 async def scale_workers():
@@ -95,11 +399,45 @@ async def scale_workers():
         WORKERS.append(task)
 
 
+async def resume_runs():
+    """Re-arm timers and re-queue runs left unfinished by a previous process.
+
+    A node that was executing when the process stopped runs again, since
+    its checkpoint is only written once it completes.
+    """
+    for state in CHECKPOINTS.load().values():
+        run = Run(**state)
+        if run.workflow_id not in WORKFLOWS:
+            workflow = read_workflow_file(run.workflow_id)
+            if workflow is None:
+                logger.warning(
+                    "Dropping run %s: workflow %s not found", run.id, run.workflow_id
+                )
+                CHECKPOINTS.discard(run.id)
+                continue
+            store_workflow(workflow)
+        RUNS[run.id] = run
+        if run.status == "waiting" and run.wake_at is not None:
+            arm_timer(run)
+        else:
+            requeue(run)
+    await scale_workers()
+
+
+async def clean_run_logs(interval: float = 3600):
+    while True:
+        active = [run.id for run in RUNS.values() if run.status not in FINISHED_STATUSES]
+        RUN_LOGS.cleanup(keep=active)
+        await asyncio.sleep(interval)
+
+
 @app.on_event("startup")
 async def startup_event():
     # start initial workers
     for _ in range(MIN_WORKERS):
         WORKERS.append(asyncio.create_task(worker()))
+    await resume_runs()
+    asyncio.create_task(clean_run_logs())
 
 
 @app.websocket("/ws/logs")
@@ -138,8 +476,8 @@ async def test_agent(agent_name: str, data: AgentTest):
 
 @router.post("/workflows", response_model=Workflow)
 def create_workflow(workflow: Workflow):
-    WORKFLOWS[workflow.id] = workflow
-    return workflow
+    store_workflow(CompactWorkflow.from_model(workflow))
+    return json_response(workflow_bytes(workflow.id))
 
 
 @router.put("/workflows/{workflow_id}", response_model=Workflow)
@@ -148,8 +486,8 @@ def update_workflow(workflow_id: str, workflow: Workflow):
         raise HTTPException(status_code=400, detail="ID mismatch")
     if workflow_id not in WORKFLOWS:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    WORKFLOWS[workflow_id] = workflow
-    return workflow
+    store_workflow(CompactWorkflow.from_model(workflow))
+    return json_response(workflow_bytes(workflow_id))
 
 
 @router.delete("/workflows/{workflow_id}")
@@ -157,6 +495,8 @@ def delete_workflow(workflow_id: str):
     if workflow_id not in WORKFLOWS:
         raise HTTPException(status_code=404, detail="Workflow not found")
     WORKFLOWS.pop(workflow_id)
+    WORKFLOW_HISTORY.pop(workflow_id, None)
+    touch_workflow(workflow_id, deleted=True)
     path = DATA_DIR / f"{workflow_id}.json"
     if path.exists():
         path.unlink()
@@ -167,33 +507,129 @@ def delete_workflow(workflow_id: str):
 def save_workflow(workflow_id: str):
     if workflow_id not in WORKFLOWS:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    workflow = WORKFLOWS[workflow_id]
     path = DATA_DIR / f"{workflow_id}.json"
-    path.write_text(workflow.json())
+    path.write_bytes(workflow_bytes(workflow_id))
     return {"saved": str(path)}
 
 
 @router.post("/workflows/{workflow_id}/load", response_model=Workflow)
 def load_workflow(workflow_id: str):
-    path = DATA_DIR / f"{workflow_id}.json"
-    if not path.exists():
+    workflow = read_workflow_file(workflow_id)
+    if workflow is None:
         raise HTTPException(status_code=404, detail="Workflow file not found")
-    data = json.loads(path.read_text())
-    workflow = Workflow(**data)
-    WORKFLOWS[workflow_id] = workflow
-    return workflow
+    store_workflow(workflow)
+    return json_response(workflow_bytes(workflow_id))
 
 
-@router.get("/workflows", response_model=List[Workflow])
-def list_workflows():
-    return list(WORKFLOWS.values())
+@router.get(
+    "/workflows",
+    response_model=None,
+    responses={200: {"model": Union[List[Workflow], List[WorkflowSummary]]}},
+)
+def list_workflows(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    prefix: str = "",
+    view: str = Query("full", pattern="^(full|summary)$"),
+):
+    """List workflows ordered by id.
+
+    ``cursor`` is the ``X-Next-Cursor`` header of the previous page.
+    ``view=summary`` returns ``WorkflowSummary`` items instead of full
+    workflows.
+    """
+    etag = f'W/"{WORKFLOWS_REVISION}-{len(WORKFLOWS)}"'
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    ids = sorted_workflow_ids()
+    start = bisect.bisect_left(ids, prefix)
+    if cursor is not None:
+        start = max(start, bisect.bisect_right(ids, cursor))
+    # ids sharing the prefix are contiguous in sorted order, so filtering the
+    # window after ``start`` keeps exactly the matching ids on this page
+    window = ids[start:] if limit is None else ids[start : start + limit + 1]
+    page = [i for i in window if i.startswith(prefix)]
+    headers = {"ETag": etag}
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        headers["X-Next-Cursor"] = page[-1]
+
+    if view == "summary":
+        summaries = []
+        for workflow_id in page:
+            workflow = WORKFLOWS[workflow_id]
+            summaries.append(
+                {
+                    "id": workflow.id,
+                    "name": workflow.name,
+                    "node_count": len(workflow.nodes),
+                    "version": workflow.version,
+                    "updated_at": workflow_meta(workflow_id)[1],
+                }
+            )
+        return json_response(dumps(summaries), headers)
+    content = b"[" + b",".join(workflow_bytes(i) for i in page) + b"]"
+    return json_response(content, headers)
 
 
 @router.get("/workflows/{workflow_id}", response_model=Workflow)
-def get_workflow(workflow_id: str):
+def get_workflow(workflow_id: str, request: Request):
     if workflow_id not in WORKFLOWS:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    return WORKFLOWS[workflow_id]
+    etag = f'"{workflow_meta(workflow_id)[0]}"'
+    headers = {"ETag": etag, "X-Workflow-Version": str(WORKFLOWS[workflow_id].version)}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return json_response(workflow_bytes(workflow_id), headers)
+
+
+@router.patch("/workflows/{workflow_id}")
+def patch_workflow(workflow_id: str, patch: WorkflowPatch):
+    """Apply JSON-Patch style operations to the current version.
+
+    ``patch.version`` must match the current version, otherwise the edit was
+    based on stale data and 409 is returned.
+    """
+    if workflow_id not in WORKFLOWS:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    current = WORKFLOWS[workflow_id]
+    if patch.version != current.version:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Version conflict: current version is {current.version}",
+        )
+    try:
+        patched = apply_patch(
+            current, [operation.model_dump() for operation in patch.operations]
+        )
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    store_workflow(patched)
+    return {"id": workflow_id, "version": patched.version}
+
+
+@router.get("/workflows/{workflow_id}/versions")
+def list_workflow_versions(workflow_id: str):
+    if workflow_id not in WORKFLOWS:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return [
+        {
+            "version": workflow.version,
+            "updated_at": updated_at,
+            "node_count": len(workflow.nodes),
+        }
+        for workflow, updated_at in WORKFLOW_HISTORY.get(workflow_id, ())
+    ]
+
+
+@router.get("/workflows/{workflow_id}/versions/{version}", response_model=Workflow)
+def get_workflow_version(workflow_id: str, version: int):
+    for workflow, _ in WORKFLOW_HISTORY.get(workflow_id, ()):
+        if workflow.version == version:
+            return json_response(workflow.to_json())
+    raise HTTPException(status_code=404, detail="Workflow version not found")
 
 
 @router.post("/workflows/{workflow_id}/validate")
@@ -208,15 +644,56 @@ def validate_workflow_endpoint(workflow_id: str):
             errors.append(f"Unknown node type: {node.type}")
             continue
         errors.extend(node_cls.validate(node.params))
+    errors.extend(subworkflow_errors(workflow_id))
     return {"valid": len(errors) == 0, "errors": errors}
 
 
-def generate_suggestions(workflow: Workflow) -> List[Suggestion]:
+def subworkflow_callees(workflow: CompactWorkflow) -> List[Any]:
+    return [
+        node.params.get("workflow_id")
+        for node in workflow.nodes
+        if node.type == SubworkflowNode.type
+    ]
+
+
+def subworkflow_errors(workflow_id: str) -> List[str]:
+    """Report missing callees and call cycles reachable from ``workflow_id``."""
+    errors: List[str] = []
+    path: List[str] = []
+    visiting: Set[str] = set()
+    done: Set[str] = set()
+
+    def visit(current: str) -> None:
+        path.append(current)
+        visiting.add(current)
+        for callee in subworkflow_callees(WORKFLOWS[current]):
+            if not isinstance(callee, str):
+                continue
+            if callee in visiting:
+                cycle = path[path.index(callee):] + [callee]
+                errors.append(f"Subworkflow cycle: {' -> '.join(cycle)}")
+            elif callee not in WORKFLOWS:
+                if current == workflow_id:
+                    errors.append(f"Unknown subworkflow: {callee}")
+            elif callee not in done:
+                visit(callee)
+        visiting.discard(current)
+        done.add(current)
+        path.pop()
+
+    visit(workflow_id)
+    return errors
+
+
+def generate_suggestions(workflow: CompactWorkflow) -> List[Suggestion]:
     suggestions: List[Suggestion] = []
     last_print: Optional[str] = None
     for node in workflow.nodes:
+        if node.type not in ("print", "add"):
+            continue
+        params = node.params
         if node.type == "print":
-            message = node.params.get("message", "")
+            message = params.get("message", "")
             if message == last_print:
                 suggestions.append(
                     Suggestion(
@@ -226,8 +703,8 @@ def generate_suggestions(workflow: Workflow) -> List[Suggestion]:
                 )
             last_print = message
         if node.type == "add":
-            a = node.params.get("a", 0)
-            b = node.params.get("b", 0)
+            a = params.get("a", 0)
+            b = params.get("b", 0)
             if a == 0 or b == 0:
                 suggestions.append(
                     Suggestion(message="Adding zero has no effect", node_id=node.id)
@@ -247,58 +724,376 @@ def suggest_workflow(workflow_id: str):
     return generate_suggestions(workflow)
 
 
-async def log(message: str, logs: List[str]):
+async def log(message: str, logs: Union[List[str], RunLog]):
     logs.append(message)
     await broadcast(message)
 
 
-async def execute_node(node: Node, logs: List[str], context: Dict[str, Any]):
+async def run_node(
+    node: CompactNode, emit: Callable[[str], Awaitable[None]], context: Dict[str, Any]
+):
     node_cls = NODE_REGISTRY.get(node.type)
     if node_cls is not None:
-        async def node_log(message: str):
-            await log(message, logs)
-
-        await node_cls.execute(node.model_dump(), node_log, context)
+        await node_cls.execute(node.to_dict(), emit, context)
     elif node.type == "agent":
-        agent_name = node.params.get("agent")
-        prompt = node.params.get("prompt", "")
+        params = node.params
+        agent_name = params.get("agent")
+        prompt = params.get("prompt", "")
         agent: BaseAgent | None = AGENTS.get(agent_name)
         if agent is None:
-            await log(f"Unknown agent: {agent_name}", logs)
+            await emit(f"Unknown agent: {agent_name}")
         else:
             response = await agent.run(prompt)
             context[node.id] = response
-            await log(f"{agent_name} -> {response}", logs)
+            await emit(f"{agent_name} -> {response}")
     else:
-        await log(f"Unknown node type: {node.type}", logs)
+        await emit(f"Unknown node type: {node.type}")
+
+
+async def execute_node(
+    node: CompactNode, logs: Union[List[str], RunLog], context: Dict[str, Any]
+):
+    async def node_log(message: str):
+        await log(message, logs)
+
+    await run_node(node, node_log, context)
+
+
+async def run_subworkflow(
+    workflow_id: str, scope: Dict[str, Any], emit: Callable[[str], Awaitable[None]]
+) -> bool:
+    """Execute a stored workflow inline against ``scope``.
+
+    The callee is the shared ``CompactWorkflow`` in ``WORKFLOWS``; nothing is
+    copied per call. Delays inside a subworkflow are awaited in place, since
+    a suspended run can only resume at a top-level node.
+    """
+    workflow = WORKFLOWS.get(workflow_id)
+    if workflow is None:
+        await emit(f"Workflow not found: {workflow_id}")
+        return False
+    stack = SUBWORKFLOW_STACK.get()
+    if workflow_id in stack:
+        await emit(f"Subworkflow cycle: {' -> '.join(stack + (workflow_id,))}")
+        return False
+    token = SUBWORKFLOW_STACK.set(stack + (workflow_id,))
+    try:
+        for node in workflow.nodes:
+            try:
+                await run_node(node, emit, scope)
+            except SuspendRun as exc:
+                await asyncio.sleep(exc.delay)
+    finally:
+        SUBWORKFLOW_STACK.reset(token)
+    return True
+
+
+SubworkflowNode.runner = run_subworkflow
 
 
 @router.post("/workflows/{workflow_id}/execute")
-async def execute_workflow(workflow_id: str):
+async def execute_workflow(workflow_id: str, timeout: Optional[float] = None):
     if workflow_id not in WORKFLOWS:
         raise HTTPException(status_code=404, detail="Workflow not found")
 
     workflow = WORKFLOWS[workflow_id]
-    logs: List[str] = []
-    context: Dict[str, Any] = {}
-
-    for node in workflow.nodes:
-        await execute_node(node, logs, context)
+    # registered like a queued run so it can be cancelled, followed through
+    # /runs/{id}/logs and counted in RUN_STATS
+    run = Run(id=str(uuid.uuid4()), workflow_id=workflow_id, status="running")
+    RUNS[run.id] = run
+    headers = {"X-Run-ID": run.id}
+
+    async def run_nodes():
+        SUBWORKFLOW_STACK.set((workflow_id,))
+        for node in workflow.nodes:
+            try:
+                await execute_node(node, run.logs, run.context)
+            except SuspendRun as exc:
+                # synchronous execution has to return logs, so just wait inline
+                await asyncio.sleep(exc.delay)
 
-    return {"logs": logs}
+    task = asyncio.create_task(run_nodes())
+    RUN_TASKS[run.id] = task
+    try:
+        await asyncio.wait_for(task, timeout or RUN_TIMEOUT or None)
+    except asyncio.TimeoutError:
+        await log("Run timed out", run.logs)
+        finish_run(run, "timed_out")
+        raise HTTPException(
+            status_code=408, detail="Workflow execution timed out", headers=headers
+        )
+    except asyncio.CancelledError:
+        requested = run.status == "cancelled"
+        finish_run(run, "cancelled")
+        if not requested:
+            # the request itself is being cancelled
+            raise
+        raise HTTPException(
+            status_code=409, detail="Workflow execution cancelled", headers=headers
+        )
+    except Exception:
+        finish_run(run, "failed")
+        raise
+    finally:
+        RUN_TASKS.pop(run.id, None)
+    finish_run(run, "completed")
+    return {"run_id": run.id, "logs": list(run.logs)}
+
+
+def get_tenant(
+    api_key: str = Depends(get_api_key), x_tenant_id: Optional[str] = Header(None)
+) -> str:
+    """Tenant that a request's runs are queued and limited under.
+
+    A tenant key always acts as its own tenant. The shared key acts as
+    ``default`` unless ``X-Tenant-ID`` names one of the configured ``TENANTS``.
+    """
+    tenant = TENANT_KEYS.get(api_key[7:])
+    if tenant is not None:
+        if x_tenant_id not in (None, tenant):
+            raise HTTPException(status_code=403, detail="API key is for another tenant")
+        return tenant
+    if x_tenant_id is None or x_tenant_id == "default":
+        return "default"
+    if x_tenant_id not in TENANTS:
+        raise HTTPException(status_code=403, detail=f"Unknown tenant: {x_tenant_id}")
+    return x_tenant_id
+
+
+def admit_run(
+    workflow_id: str, tenant: str, priority: int = 0, timeout: Optional[float] = None
+) -> Run:
+    """Create a run and put it on the queue; raises ``QueueFull``.
+
+    The caller checkpoints the run and scales the workers.
+    """
+    run = Run(
+        id=uuid.uuid4().hex, workflow_id=workflow_id, tenant=tenant, priority=priority
+    )
+    timeout = timeout or RUN_TIMEOUT
+    if timeout:
+        run.deadline = time.time() + timeout
+    WORKFLOW_QUEUE.put_nowait(run.id, tenant, priority)
+    RUNS[run.id] = run
+    return run
 
 
 @router.post("/workflows/{workflow_id}/enqueue")
-async def enqueue_workflow(workflow_id: str):
+async def enqueue_workflow(
+    workflow_id: str,
+    timeout: Optional[float] = None,
+    priority: int = 0,
+    tenant: str = Depends(get_tenant),
+):
+    """Queue a run. Higher ``priority`` runs go first within the tenant."""
     if workflow_id not in WORKFLOWS:
         raise HTTPException(status_code=404, detail="Workflow not found")
-    await WORKFLOW_QUEUE.put(workflow_id)
+    try:
+        run = admit_run(workflow_id, tenant, priority, timeout)
+    except QueueFull:
+        raise HTTPException(status_code=429, detail="Tenant queue is full")
+    checkpoint(run)
     await scale_workers()
-    return {"queued": workflow_id, "queue_size": WORKFLOW_QUEUE.qsize()}
+    return {
+        "queued": workflow_id,
+        "run_id": run.id,
+        "queue_size": WORKFLOW_QUEUE.qsize(),
+    }
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streams NDJSON results while the request body is still being read.
+
+    Before ASGI 2.4 Starlette listens for client disconnects by calling
+    ``receive()`` alongside the stream, which would swallow the request body
+    messages the stream is waiting for. The listener only starts once
+    ``body_done`` is set.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, content: AsyncIterator[bytes], body_done: asyncio.Event):
+        super().__init__(content)
+        self.body_done = body_done
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await self.body_done.wait()
+        await super().listen_for_disconnect(receive)
+
+
+async def ndjson_lines(
+    request: Request, body_done: asyncio.Event
+) -> AsyncIterator[List[Tuple[int, bytes]]]:
+    """Yield the complete, non-blank lines of an NDJSON body chunk by chunk.
+
+    Lines are numbered from 1 and the body is never held in memory as a whole.
+    ``body_done`` is set once the body has been read.
+    """
+    buffer = b""
+    line_no = 0
+    try:
+        async for chunk in request.stream():
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            batch = []
+            for line in lines:
+                line_no += 1
+                if line.strip():
+                    batch.append((line_no, line))
+            if batch:
+                yield batch
+    finally:
+        body_done.set()
+    if buffer.strip():
+        yield [(line_no + 1, buffer)]
+
+
+def ndjson_error(line_no: int, e: ValidationError) -> bytes:
+    errors = e.errors(include_url=False, include_context=False, include_input=False)
+    return dumps({"line": line_no, "error": errors}) + b"\n"
+
+
+@router.post("/workflows/bulk")
+async def bulk_create_workflows(request: Request):
+    """Create or replace workflows from an NDJSON body, one workflow per line.
+
+    Results are streamed back as NDJSON in input order as each chunk of the
+    body is processed.
+    """
+
+    body_done = asyncio.Event()
+
+    async def results():
+        async for batch in ndjson_lines(request, body_done):
+            out = []
+            for line_no, line in batch:
+                try:
+                    workflow = Workflow.model_validate_json(line)
+                except ValidationError as e:
+                    out.append(ndjson_error(line_no, e))
+                    continue
+                stored = store_workflow(CompactWorkflow.from_model(workflow))
+                out.append(
+                    dumps({"line": line_no, "id": stored.id, "version": stored.version})
+                    + b"\n"
+                )
+            yield b"".join(out)
+
+    return NDJSONStreamingResponse(results(), body_done)
+
+
+@router.post("/runs/bulk")
+async def bulk_enqueue_runs(request: Request, tenant: str = Depends(get_tenant)):
+    """Enqueue runs from an NDJSON body of ``RunRequest`` objects.
+
+    Each chunk of the body is admitted in one step: all of its runs are
+    queued, checkpointed with a single write and the pool is scaled once.
+    """
+
+    body_done = asyncio.Event()
+
+    async def results():
+        async for batch in ndjson_lines(request, body_done):
+            out = []
+            admitted = []
+            for line_no, line in batch:
+                try:
+                    item = RunRequest.model_validate_json(line)
+                except ValidationError as e:
+                    out.append(ndjson_error(line_no, e))
+                    continue
+                result: Dict[str, Any] = {"line": line_no}
+                if item.workflow_id not in WORKFLOWS:
+                    result["error"] = "Workflow not found"
+                else:
+                    try:
+                        run = admit_run(
+                            item.workflow_id, tenant, item.priority, item.timeout
+                        )
+                        admitted.append(run)
+                        result["run_id"] = run.id
+                    except QueueFull:
+                        result["error"] = "Tenant queue is full"
+                out.append(dumps(result) + b"\n")
+            CHECKPOINTS.save_many([run.model_dump() for run in admitted])
+            await scale_workers()
+            yield b"".join(out)
+
+    return NDJSONStreamingResponse(results(), body_done)
+
+
+@router.get("/runs/{run_id}")
+def get_run(run_id: str):
+    run = RUNS.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run.model_dump()
+
+
+@router.get("/runs/{run_id}/logs")
+async def get_run_logs(
+    run_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=MAX_LOG_PAGE),
+    follow: bool = False,
+    wait: float = Query(30, ge=0, le=60),
+):
+    """Read a range of a run's log lines.
+
+    With ``follow`` the request long-polls for up to ``wait`` seconds when
+    there is nothing at ``offset`` yet and the run is still in progress;
+    clients keep passing back ``next_offset`` to tail the log.
+    """
+    run = RUNS.get(run_id)
+    if run is not None:
+        logs = run.logs
+    elif RUN_LOGS.exists(run_id):
+        logs = RUN_LOGS.open(run_id)
+    else:
+        raise HTTPException(status_code=404, detail="Run not found")
+    finished = run is None or run.status in FINISHED_STATUSES
+    if follow and not finished:
+        await logs.wait(offset, wait)
+    offset = max(offset, logs.start)
+    lines = logs.read(offset, limit)
+    return {
+        "run_id": run_id,
+        "offset": offset,
+        "next_offset": offset + len(lines),
+        "lines": lines,
+        "finished": finished,
+    }
+
+
+@router.post("/runs/{run_id}/cancel")
+async def cancel_run(run_id: str):
+    run = RUNS.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if run.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Run already {run.status}")
+    task = RUN_TASKS.get(run_id)
+    if task is not None and not task.done():
+        # the worker running it records the cancellation once the task unwinds
+        run.status = "cancelled"
+        task.cancel()
+    else:
+        # a task that already finished (e.g. parked on a timer) won't unwind
+        # through the cancellation handler, so record it here
+        if run.status == "queued":
+            WORKFLOW_QUEUE.discard(run.id)
+        finish_run(run, "cancelled")
+    return {"run_id": run_id, "status": run.status}
 
 
 @router.get("/queue/status")
 def queue_status():
-    return {"queue_size": WORKFLOW_QUEUE.qsize(), "workers": len(WORKERS)}
+    return {
+        "queue_size": WORKFLOW_QUEUE.qsize(),
+        "tenants": WORKFLOW_QUEUE.tenant_sizes(),
+        "workers": len(WORKERS),
+        "running": len(RUN_TASKS),
+        "waiting": len(TIMERS),
+        "runs": RUN_STATS,
+    }
 
 app.include_router(router)
@@ -1,5 +1,18 @@
 from typing import Dict, Any, List, Callable, Awaitable
 import asyncio
+import os
+
+# Delays at or above this threshold suspend the run instead of sleeping
+# inside the worker; shorter ones are cheaper to just await in place.
+DELAY_SUSPEND_MS = int(os.getenv("DELAY_SUSPEND_MS", "1000"))
+
+
+class SuspendRun(Exception):
+    """Raised by a node to ask the runtime to park the run for ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        super().__init__(delay)
+        self.delay = delay
 
 
 class NodeBase:
@@ -149,6 +162,8 @@ class LoopNode(NodeBase):
         count = int(params.get("count", 1))
         for i in range(count):
             await log(f"loop {i + 1}/{count}")
+            # yield so long loops can be cancelled and don't starve other runs
+            await asyncio.sleep(0)
 
     @classmethod
     def validate(cls, params: Dict[str, Any]) -> List[str]:
@@ -171,6 +186,8 @@ class DelayNode(NodeBase):
         params = node.get("params", {})
         ms = int(params.get("ms", 1000))
         await log(f"delay {ms}ms")
+        if ms >= DELAY_SUSPEND_MS:
+            raise SuspendRun(ms / 1000.0)
         await asyncio.sleep(ms / 1000.0)
 
     @classmethod
@@ -298,3 +315,59 @@ class ModuloNode(NodeBase):
         if not isinstance(params.get("b"), (int, float)):
             errors.append("'b' must be a number")
         return errors
+
+
+SubworkflowRunner = Callable[
+    [str, Dict[str, Any], Callable[[str], Awaitable[None]]], Awaitable[bool]
+]
+
+
+@register_node
+class SubworkflowNode(NodeBase):
+    """Run another stored workflow inline, in the caller's run.
+
+    ``inputs`` maps callee context keys to caller context keys and
+    ``outputs`` maps caller keys to callee keys. The callee starts from a
+    fresh context holding only its inputs; without ``outputs`` its whole
+    context is stored under the node id. Looking up and executing the callee
+    is left to ``runner``, which the application installs.
+    """
+
+    type = "subworkflow"
+    runner: SubworkflowRunner | None = None
+
+    @classmethod
+    async def execute(
+        cls,
+        node: Dict[str, Any],
+        log: Callable[[str], Awaitable[None]],
+        context: Dict[str, Any],
+    ):
+        params = node.get("params", {})
+        workflow_id = params.get("workflow_id")
+        inputs = params.get("inputs", {})
+        outputs = params.get("outputs", {})
+        if cls.runner is None:
+            await log("subworkflows are not available")
+            return
+        scope = {callee: context.get(caller) for callee, caller in inputs.items()}
+        if not await cls.runner(workflow_id, scope, log):
+            return
+        if outputs:
+            for caller, callee in outputs.items():
+                context[caller] = scope.get(callee)
+        else:
+            context[node.get("id", "result")] = scope
+
+    @classmethod
+    def validate(cls, params: Dict[str, Any]) -> List[str]:
+        errors = []
+        if not isinstance(params.get("workflow_id"), str):
+            errors.append("'workflow_id' must be a string")
+        for key in ("inputs", "outputs"):
+            mapping = params.get(key, {})
+            if not isinstance(mapping, dict) or not all(
+                isinstance(v, str) for v in mapping.values()
+            ):
+                errors.append(f"'{key}' must map names to context keys")
+        return errors
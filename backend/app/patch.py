@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+import copy
+
+from .compact import CompactNode, CompactWorkflow
+
+
+class PatchError(ValueError):
+    """Raised when a patch operation can't be applied."""
+
+
+def _split(path: str) -> List[str]:
+    if not path.startswith("/"):
+        raise PatchError(f"invalid path: {path!r}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def _index(token: str, size: int, allow_end: bool = False) -> int:
+    if allow_end and token == "-":
+        return size
+    if not token.isdigit() or (len(token) > 1 and token[0] == "0"):
+        raise PatchError(f"invalid array index: {token!r}")
+    index = int(token)
+    if index > size or (index == size and not allow_end):
+        raise PatchError(f"index out of range: {index}")
+    return index
+
+
+def _node_from_value(value: Any) -> CompactNode:
+    if not isinstance(value, dict):
+        raise PatchError("node value must be an object")
+    node_id, node_type = value.get("id"), value.get("type")
+    params = value.get("params", {})
+    if not isinstance(node_id, str) or not isinstance(node_type, str):
+        raise PatchError("node 'id' and 'type' must be strings")
+    if not isinstance(params, dict):
+        raise PatchError("node 'params' must be an object")
+    return CompactNode.from_params(node_id, node_type, params)
+
+
+def _apply_to_value(doc: Any, tokens: List[str], op: str, value: Any) -> Any:
+    """Apply a single operation inside a plain JSON value; returns the new value."""
+    if not tokens:
+        if op == "remove":
+            raise PatchError("can't remove the document root")
+        if op == "test":
+            if doc != value:
+                raise PatchError("test failed")
+            return doc
+        return copy.deepcopy(value)
+
+    token, rest = tokens[0], tokens[1:]
+    if isinstance(doc, dict):
+        if rest or op in ("replace", "remove", "test"):
+            if token not in doc:
+                raise PatchError(f"path not found: {token!r}")
+        if rest:
+            doc[token] = _apply_to_value(doc[token], rest, op, value)
+        elif op == "remove":
+            del doc[token]
+        elif op == "test":
+            _apply_to_value(doc[token], [], op, value)
+        else:
+            doc[token] = copy.deepcopy(value)
+        return doc
+    if isinstance(doc, list):
+        index = _index(token, len(doc), allow_end=op == "add" and not rest)
+        if rest:
+            doc[index] = _apply_to_value(doc[index], rest, op, value)
+        elif op == "add":
+            doc.insert(index, copy.deepcopy(value))
+        elif op == "remove":
+            del doc[index]
+        elif op == "test":
+            _apply_to_value(doc[index], [], op, value)
+        else:
+            doc[index] = copy.deepcopy(value)
+        return doc
+    raise PatchError(f"path not found: {token!r}")
+
+
+def _apply_to_node(node: CompactNode, tokens: List[str], op: str, value: Any) -> CompactNode:
+    field, rest = tokens[0], tokens[1:]
+    if field == "params":
+        params = _apply_to_value(node.params, rest, op, value)
+        if op == "test":
+            return node
+        if not isinstance(params, dict):
+            raise PatchError("node 'params' must be an object")
+        return CompactNode.from_params(node.id, node.type, params)
+    if field not in ("id", "type") or rest:
+        raise PatchError(f"unsupported node path: /{'/'.join(tokens)}")
+    if op == "test":
+        if getattr(node, field) != value:
+            raise PatchError("test failed")
+        return node
+    if op != "replace":
+        raise PatchError(f"only 'replace' and 'test' are allowed on node {field!r}")
+    if not isinstance(value, str):
+        raise PatchError(f"node {field!r} must be a string")
+    if field == "id":
+        return CompactNode(value, node.type, node._params)
+    return CompactNode(node.id, value, node._params)
+
+
+def apply_patch(
+    workflow: CompactWorkflow, operations: List[Dict[str, Any]]
+) -> CompactWorkflow:
+    """Apply JSON-Patch style ``operations`` and return the next version.
+
+    Only nodes touched by an operation are rebuilt; every other
+    ``CompactNode`` is shared with ``workflow``. The node tuple itself is
+    still copied (O(n) pointers) once any node is edited; patches that only
+    touch the name or only test leave it shared. The patch is atomic: if any
+    operation fails ``PatchError`` is raised and nothing is returned.
+    """
+    name = workflow.name
+    nodes: Sequence[CompactNode] = workflow.nodes
+    for operation in operations:
+        op, value = operation["op"], operation.get("value")
+        tokens = _split(operation["path"])
+        head, rest = tokens[0], tokens[1:]
+        if head == "name" and not rest:
+            if op == "test":
+                if name != value:
+                    raise PatchError("test failed")
+            elif op == "replace" and isinstance(value, str):
+                name = value
+            else:
+                raise PatchError("'name' only supports replace with a string and test")
+        elif head == "nodes" and rest:
+            allow_end = op == "add" and len(rest) == 1
+            index = _index(rest[0], len(nodes), allow_end=allow_end)
+            if op != "test" and isinstance(nodes, tuple):
+                nodes = list(nodes)
+            if len(rest) > 1:
+                node = _apply_to_node(nodes[index], rest[1:], op, value)
+                if op != "test":
+                    nodes[index] = node
+            elif op == "add":
+                nodes.insert(index, _node_from_value(value))
+            elif op == "remove":
+                del nodes[index]
+            elif op == "replace":
+                nodes[index] = _node_from_value(value)
+            elif nodes[index].to_dict() != value:
+                raise PatchError("test failed")
+        else:
+            raise PatchError(f"unsupported path: {operation['path']!r}")
+    return CompactWorkflow(workflow.id, name, nodes, workflow.version + 1)
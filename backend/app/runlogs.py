@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+import asyncio
+import bisect
+import mmap
+import shutil
+import time
+
+# index entries are buffered and written in batches of this many lines
+_INDEX_BATCH = 256
+
+
+class _Segment:
+    __slots__ = ("first", "count", "size")
+
+    def __init__(self, first: int, count: int = 0, size: int = 0):
+        self.first = first
+        self.count = count
+        self.size = size
+
+
+class RunLog:
+    """Append-only, disk-backed log of one run.
+
+    Lines are written to segment files named after their first line number.
+    Next to every ``.log`` segment an ``.idx`` file holds the end offset of
+    each line as native ``Q`` integers, so any range of lines is found with
+    one bisect over the segments and two reads from memory-mapped files.
+    Only per-segment counters and a small batch of unflushed offsets are
+    kept in memory, however long the log grows. Once there are more than
+    ``max_segments`` segments the oldest ones are deleted and ``start``
+    moves forward.
+    """
+
+    def __init__(self, path: Path, segment_bytes: int = 4 << 20, max_segments: int = 0):
+        self.path = Path(path)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self._segments: List[_Segment] = []
+        self._log_fh = None
+        self._idx_fh = None
+        self._pending = array("Q")
+        self._followers: List[asyncio.Future] = []
+        self._load()
+
+    def _files(self, segment: _Segment):
+        stem = self.path / f"{segment.first:012d}"
+        return stem.with_suffix(".log"), stem.with_suffix(".idx")
+
+    def _load(self) -> None:
+        if not self.path.is_dir():
+            return
+        for idx_path in sorted(self.path.glob("*.idx")):
+            segment = _Segment(int(idx_path.stem))
+            log_path = idx_path.with_suffix(".log")
+            log_size = log_path.stat().st_size if log_path.exists() else 0
+            ends = array("Q")
+            ends.frombytes(idx_path.read_bytes()[: idx_path.stat().st_size // 8 * 8])
+            # drop entries whose line never fully reached the log file
+            while ends and ends[-1] > log_size:
+                ends.pop()
+            segment.count = len(ends)
+            segment.size = ends[-1] if ends else 0
+            self._segments.append(segment)
+
+    @property
+    def start(self) -> int:
+        """Number of the oldest line still on disk."""
+        return self._segments[0].first if self._segments else 0
+
+    def __len__(self) -> int:
+        if not self._segments:
+            return 0
+        last = self._segments[-1]
+        return last.first + last.count
+
+    def __iter__(self) -> Iterator[str]:
+        offset = self.start
+        while True:
+            lines = self.read(offset, 1000)
+            if not lines:
+                return
+            yield from lines
+            offset += len(lines)
+
+    def _open_tail(self) -> _Segment:
+        if not self._segments or self._segments[-1].size >= self.segment_bytes:
+            self._close_files()
+            self._segments.append(_Segment(len(self)))
+            self._trim()
+        segment = self._segments[-1]
+        if self._log_fh is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            log_path, idx_path = self._files(segment)
+            self._log_fh = log_path.open("ab")
+            self._log_fh.truncate(segment.size)
+            self._idx_fh = idx_path.open("ab")
+            self._idx_fh.truncate(segment.count * 8)
+        return segment
+
+    def _trim(self) -> None:
+        while self.max_segments and len(self._segments) > self.max_segments:
+            for path in self._files(self._segments.pop(0)):
+                path.unlink(missing_ok=True)
+
+    def append(self, message: str) -> None:
+        self.extend((message,))
+
+    def extend(self, messages: Iterable[str]) -> None:
+        for message in messages:
+            segment = self._open_tail()
+            data = message.encode("utf-8", "replace") + b"\n"
+            self._log_fh.write(data)
+            segment.size += len(data)
+            segment.count += 1
+            self._pending.append(segment.size)
+            if len(self._pending) >= _INDEX_BATCH or segment.size >= self.segment_bytes:
+                self.flush()
+        self._wake_followers()
+
+    def _wake_followers(self) -> None:
+        followers, self._followers = self._followers, []
+        for follower in followers:
+            if not follower.done():
+                follower.set_result(None)
+
+    def flush(self) -> None:
+        if self._log_fh is None:
+            return
+        # the log is written before its index so a crash never indexes a torn line
+        self._log_fh.flush()
+        self._idx_fh.write(self._pending.tobytes())
+        self._idx_fh.flush()
+        self._pending = array("Q")
+
+    def _close_files(self) -> None:
+        self.flush()
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._idx_fh.close()
+            self._log_fh = self._idx_fh = None
+
+    def close(self) -> None:
+        """Flush and release the file handles, waking any followers."""
+        self._close_files()
+        self._wake_followers()
+
+    async def wait(self, offset: int, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for a line at ``offset`` or a close."""
+        if len(self) > offset:
+            return
+        follower = asyncio.get_running_loop().create_future()
+        self._followers.append(follower)
+        try:
+            await asyncio.wait_for(follower, timeout)
+        except asyncio.TimeoutError:
+            if follower in self._followers:
+                self._followers.remove(follower)
+
+    def read(self, offset: int, limit: int) -> List[str]:
+        """Return up to ``limit`` lines starting at line ``offset``."""
+        self.flush()
+        offset = max(offset, self.start)
+        end = min(len(self), offset + limit)
+        lines: List[str] = []
+        i = bisect.bisect_right([s.first for s in self._segments], offset) - 1
+        while offset < end and 0 <= i < len(self._segments):
+            segment = self._segments[i]
+            stop = min(end, segment.first + segment.count)
+            try:
+                lines.extend(self._read_segment(segment, offset - segment.first, stop - segment.first))
+            except FileNotFoundError:
+                # removed by retention cleanup
+                return lines
+            offset = stop
+            i += 1
+        return lines
+
+    def _read_segment(self, segment: _Segment, lo: int, hi: int) -> List[str]:
+        if lo >= hi:
+            return []
+        log_path, idx_path = self._files(segment)
+        ends = array("Q")
+        with idx_path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as idx:
+            ends.frombytes(idx[max(lo - 1, 0) * 8 : hi * 8])
+        if lo == 0:
+            ends.insert(0, 0)
+        with log_path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as log:
+            data = log[ends[0] : ends[-1]]
+        base = ends[0]
+        return [
+            data[start - base : stop - base - 1].decode("utf-8", "replace")
+            for start, stop in zip(ends, ends[1:])
+        ]
+
+
+class RunLogStore:
+    """Directory of ``RunLog``s, one subdirectory per run."""
+
+    def __init__(
+        self,
+        root: Path,
+        segment_bytes: int = 4 << 20,
+        max_segments: int = 0,
+        retention: float = 0,
+    ):
+        self.root = Path(root)
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.retention = retention
+
+    def _path(self, run_id: str) -> Path:
+        return self.root / run_id
+
+    def exists(self, run_id: str) -> bool:
+        return self._path(run_id).is_dir()
+
+    def open(self, run_id: str) -> RunLog:
+        """Return the log of ``run_id``, continuing any lines already on disk."""
+        return RunLog(self._path(run_id), self.segment_bytes, self.max_segments)
+
+    def cleanup(self, keep: Iterable[str] = (), now: Optional[float] = None) -> List[str]:
+        """Delete logs not written to for ``retention`` seconds.
+
+        Runs in ``keep`` (those still in progress) are left alone. Returns the
+        ids of the removed logs.
+        """
+        if not self.retention or not self.root.is_dir():
+            return []
+        cutoff = (now if now is not None else time.time()) - self.retention
+        keep = set(keep)
+        removed = []
+        for path in self.root.iterdir():
+            if path.name in keep or not path.is_dir():
+                continue
+            mtimes = [p.stat().st_mtime for p in path.iterdir()]
+            if max(mtimes, default=0) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path.name)
+        return removed
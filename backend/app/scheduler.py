@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import itertools
+
+
+class QueueFull(Exception):
+    """Raised when a tenant already has its maximum number of queued items."""
+
+
+class _Tenant:
+    __slots__ = ("heap", "vtime", "weight", "size")
+
+    def __init__(self, weight: float):
+        self.heap: List[Tuple[int, int, Any]] = []
+        self.vtime = 0.0
+        self.weight = weight
+        # queued items not discarded; the heap may also hold discarded ones
+        self.size = 0
+
+
+class FairQueue:
+    """Async queue with per-item priorities and weighted fair sharing.
+
+    Every tenant has its own heap ordered by priority (higher first, FIFO
+    within a priority). Tenants with queued items sit in a heap keyed by
+    their virtual time, which advances by ``1 / weight`` per dequeued item,
+    so a tenant with weight 2 gets twice the share of one with weight 1 and
+    a large backlog from one tenant can't starve the others. A tenant that
+    becomes active starts at the current virtual time rather than being
+    credited for the time it was idle. ``put_nowait`` and ``get`` are
+    O(log n). ``discard`` is O(1): discarded items stop counting towards
+    sizes and limits at once and are skipped when they reach the front.
+    """
+
+    def __init__(
+        self,
+        max_per_tenant: int = 0,
+        weights: Optional[Dict[str, float]] = None,
+        default_weight: float = 1.0,
+    ):
+        self.max_per_tenant = max_per_tenant
+        self.weights = weights or {}
+        self.default_weight = default_weight
+        self._tenants: Dict[str, _Tenant] = {}
+        self._active: List[Tuple[float, int, str]] = []
+        self._vtime = 0.0
+        self._size = 0
+        self._counter = itertools.count()
+        # item -> (tenant, sequence number) of its live entry
+        self._entries: Dict[Any, Tuple[str, int]] = {}
+        self._discarded: Set[int] = set()
+        self._getters: Deque[asyncio.Future] = deque()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def tenant_sizes(self) -> Dict[str, int]:
+        return {name: t.size for name, t in self._tenants.items() if t.size}
+
+    def put_nowait(
+        self, item: Any, tenant: str = "default", priority: int = 0, force: bool = False
+    ) -> None:
+        """Queue ``item`` for ``tenant``.
+
+        Raises ``QueueFull`` if the tenant is at ``max_per_tenant``, unless
+        ``force`` is set (used when re-queueing work that was already admitted).
+        """
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _Tenant(
+                self.weights.get(tenant, self.default_weight)
+            )
+        if not force and self.max_per_tenant and state.size >= self.max_per_tenant:
+            raise QueueFull(tenant)
+        if not state.heap:
+            state.vtime = max(state.vtime, self._vtime)
+            heapq.heappush(self._active, (state.vtime, next(self._counter), tenant))
+        seq = next(self._counter)
+        heapq.heappush(state.heap, (-priority, seq, item))
+        self._entries[item] = (tenant, seq)
+        state.size += 1
+        self._size += 1
+        self._wake_next()
+
+    def discard(self, item: Any) -> bool:
+        """Remove a queued ``item``; returns False if it isn't queued."""
+        entry = self._entries.pop(item, None)
+        if entry is None:
+            return False
+        tenant, seq = entry
+        self._discarded.add(seq)
+        self._tenants[tenant].size -= 1
+        self._size -= 1
+        return True
+
+    def get_nowait(self) -> Any:
+        if not self._size:
+            raise asyncio.QueueEmpty
+        while True:
+            vtime, _, tenant = heapq.heappop(self._active)
+            state = self._tenants[tenant]
+            _, seq, item = heapq.heappop(state.heap)
+            live = seq not in self._discarded
+            if live:
+                if self._entries.get(item, (None, None))[1] == seq:
+                    del self._entries[item]
+                self._vtime = vtime
+                state.vtime = vtime + 1.0 / state.weight
+                state.size -= 1
+            else:
+                self._discarded.discard(seq)
+            if state.heap:
+                heapq.heappush(self._active, (state.vtime, next(self._counter), tenant))
+            else:
+                # idle tenants are dropped; they restart at the current virtual time
+                del self._tenants[tenant]
+            if live:
+                self._size -= 1
+                return item
+
+    async def get(self) -> Any:
+        while not self._size:
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                if self._size and not getter.cancelled():
+                    # we were woken but won't consume; pass the wakeup on
+                    self._wake_next()
+                raise
+        return self.get_nowait()
+
+    def _wake_next(self) -> None:
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                break
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+# orjson only handles 64-bit integers: it refuses to encode wider ones and
+# decodes them as floats, so documents that may hold one go through json
+_LONG_DIGITS = re.compile(rb"\d{20}")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as compact UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        raw = data.encode() if isinstance(data, str) else data
+        if not _LONG_DIGITS.search(raw):
+            return orjson.loads(raw)
+    return json.loads(data)
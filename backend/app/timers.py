@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TimerScheduler:
+    """Central min-heap of pending wakeups.
+
+    A single background task sleeps until the earliest deadline and fires the
+    callback for every timer that is due. Cancelled or rescheduled timers are
+    left in the heap and skipped lazily when they surface, so ``schedule`` and
+    ``cancel`` stay O(log n) / O(1) even with hundreds of thousands of entries.
+    """
+
+    def __init__(self, on_fire: Callable[[str], Awaitable[None]]):
+        self._on_fire = on_fire
+        self._heap: List[Tuple[float, int, str]] = []
+        self._pending: Dict[str, float] = {}
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._pending
+
+    def schedule(self, key: str, when: float) -> None:
+        """Fire ``key`` at wall-clock time ``when``, replacing any earlier timer."""
+        self._pending[key] = when
+        heapq.heappush(self._heap, (when, next(self._counter), key))
+        self._ensure_started()
+        if self._heap[0][2] == key:
+            self._wakeup.set()
+
+    def cancel(self, key: str) -> bool:
+        """Drop the pending timer for ``key``. Returns False if none was set."""
+        return self._pending.pop(key, None) is not None
+
+    def due_at(self, key: str) -> Optional[float]:
+        return self._pending.get(key)
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            while self._heap and self._pending.get(self._heap[0][2]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            when, _, key = self._heap[0]
+            delay = when - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            del self._pending[key]
+            try:
+                await self._on_fire(key)
+            except Exception:  # pragma: no cover - a bad callback shouldn't stop timers
+                logger.exception("Timer callback for %s failed", key)
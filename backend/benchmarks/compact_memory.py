@@ -0,0 +1,63 @@
+"""Compare memory and build time of pydantic and compact workflow storage.
+
+Run from the backend directory:
+
+    python benchmarks/compact_memory.py [node_count]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.compact import CompactWorkflow
+from app.main import Workflow
+
+NODE_TYPES = ["print", "add", "multiply", "condition", "delay"]
+
+
+def generate(count: int) -> dict:
+    return {
+        "id": "bench",
+        "name": "Benchmark",
+        "nodes": [
+            {
+                "id": str(i),
+                "type": NODE_TYPES[i % len(NODE_TYPES)],
+                "params": {"message": f"node {i}", "a": i, "b": 2},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def measure(label: str, build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {size / 2**20:8.1f} MiB {elapsed * 1000:9.1f} ms")
+    return result
+
+
+def main(count: int):
+    data = generate(count)
+    print(f"{count} nodes")
+    model = measure("pydantic Workflow", lambda: Workflow(**data))
+    measure("CompactWorkflow from model", lambda: CompactWorkflow.from_model(model))
+    compact = CompactWorkflow.from_model(model)
+    start = time.perf_counter()
+    model.model_dump_json()
+    print(f"{'serialize pydantic':<28} {'':>12} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    start = time.perf_counter()
+    compact.to_json()
+    print(f"{'serialize compact':<28} {'':>12} {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import main
+from app.checkpoints import CheckpointStore
+from app.runlogs import RunLogStore
+from app.scheduler import FairQueue
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    # keep saved workflows, checkpoints and run logs written by tests out of
+    # the data directory
+    monkeypatch.setattr(main, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(main, "CHECKPOINTS", CheckpointStore(tmp_path / "runs.ckpt"))
+    monkeypatch.setattr(main, "RUN_LOGS", RunLogStore(tmp_path / "logs"))
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def run_queue(monkeypatch):
+    # TestClient runs every request on its own event loop, so workers and
+    # queue waiters must not outlive a test
+    monkeypatch.setattr(main, "WORKFLOW_QUEUE", FairQueue(main.MAX_TENANT_QUEUE))
+    monkeypatch.setattr(main, "WORKERS", [])
@@ -0,0 +1,73 @@
+import json
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import main
+from app.main import app, RUNS, WORKFLOWS
+from app.scheduler import FairQueue
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+
+def ndjson(items):
+    return "\n".join(json.dumps(item) for item in items).encode()
+
+
+def parse(res):
+    return [json.loads(line) for line in res.text.splitlines()]
+
+
+def test_bulk_create_workflows():
+    body = ndjson(
+        [
+            {"id": "bulk1", "name": "One", "nodes": []},
+            {"id": "bulk2", "name": "Two"},
+            {
+                "id": "bulk3",
+                "name": "Three",
+                "nodes": [{"id": "1", "type": "print", "params": {"message": "hi"}}],
+            },
+        ]
+    )
+    body = body.replace(b"\n", b"\n\n", 1)
+    res = client.post("/workflows/bulk", content=body, headers=HEADERS)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    results = parse(res)
+    assert results[0] == {"line": 1, "id": "bulk1", "version": 1}
+    assert results[1]["line"] == 3
+    assert results[1]["error"][0]["loc"] == ["nodes"]
+    assert results[2] == {"line": 4, "id": "bulk3", "version": 1}
+    assert "bulk2" not in WORKFLOWS
+    assert WORKFLOWS["bulk3"].nodes[0].params == {"message": "hi"}
+
+
+def test_bulk_enqueue_runs(monkeypatch):
+    monkeypatch.setattr(main, "TENANTS", {"nightly"})
+    # pretend the pool is saturated so nothing is consumed during the test
+    monkeypatch.setattr(main, "WORKERS", [None] * main.MAX_WORKERS)
+    client.post(
+        "/workflows", json={"id": "bulk_run", "name": "Run", "nodes": []}, headers=HEADERS
+    )
+    body = ndjson(
+        [
+            {"workflow_id": "bulk_run", "priority": 2},
+            {"workflow_id": "missing"},
+            {"workflow_id": "bulk_run", "timeout": 30},
+        ]
+    )
+    res = client.post(
+        "/runs/bulk", content=body, headers={**HEADERS, "X-Tenant-ID": "nightly"}
+    )
+    results = parse(res)
+    assert [r["line"] for r in results] == [1, 2, 3]
+    assert results[1]["error"] == "Workflow not found"
+    first = RUNS[results[0]["run_id"]]
+    assert first.priority == 2 and first.tenant == "nightly"
+    assert RUNS[results[2]["run_id"]].deadline is not None
+    assert main.WORKFLOW_QUEUE.tenant_sizes() == {"nightly": 2}
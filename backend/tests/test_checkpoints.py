@@ -0,0 +1,68 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import main
+from app.checkpoints import CheckpointStore
+from app.compact import CompactWorkflow
+from app.main import RUNS, WORKFLOWS, Workflow, resume_runs
+
+
+def test_checkpoint_replay_and_compaction(tmp_path):
+    path = tmp_path / "runs.ckpt"
+    store = CheckpointStore(path, compact_ratio=2, min_records=4)
+    store.save({"id": "a", "position": 0})
+    store.save({"id": "a", "position": 1})
+    store.save({"id": "b", "position": 0})
+    store.discard("b")
+    # the fourth record triggered compaction down to the single live run
+    assert len(path.read_text().splitlines()) == 1
+    store.save({"id": "a", "position": 2})
+    store.close()
+
+    # a torn trailing write is ignored on replay
+    with path.open("a") as fh:
+        fh.write('{"run": {"id": "c"')
+    states = CheckpointStore(path).load()
+    assert states == {"a": {"id": "a", "position": 2}}
+
+
+def test_resume_runs_from_checkpoint(tmp_path, monkeypatch):
+    store = CheckpointStore(tmp_path / "runs.ckpt")
+    monkeypatch.setattr(main, "CHECKPOINTS", store)
+    WORKFLOWS["wf_resume"] = CompactWorkflow.from_model(
+        Workflow(
+            id="wf_resume",
+            name="Resume",
+            nodes=[
+                {"id": "1", "type": "add", "params": {"a": 1, "b": 2}},
+                {"id": "2", "type": "print", "params": {"message": "resumed"}},
+            ],
+        )
+    )
+    # state as written after the first node finished, before a restart
+    store.save(
+        {
+            "id": "run_resume",
+            "workflow_id": "wf_resume",
+            "status": "running",
+            "position": 1,
+            "context": {"1": 3},
+            "wake_at": None,
+        }
+    )
+    store.close()
+
+    async def scenario():
+        await resume_runs()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    run = RUNS["run_resume"]
+    assert run.status == "completed"
+    # the add node was not executed again
+    assert list(run.logs) == ["resumed"]
+    assert run.context == {"1": 3}
+    assert CheckpointStore(tmp_path / "runs.ckpt").load() == {}
@@ -0,0 +1,56 @@
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.compact import CompactWorkflow
+from app.main import Workflow
+
+
+def make_workflow(count: int) -> Workflow:
+    return Workflow(
+        id="compact",
+        name="Compact ✓",
+        nodes=[
+            {"id": str(i), "type": "print", "params": {"message": f"node {i}"}}
+            for i in range(count)
+        ]
+        + [{"id": "empty", "type": "loop", "params": {}}],
+    )
+
+
+def test_compact_round_trip():
+    model = make_workflow(3)
+    compact = CompactWorkflow.from_model(model)
+    assert json.loads(compact.to_json()) == model.model_dump()
+    assert compact.to_dict() == model.model_dump()
+
+    node = compact.nodes[0]
+    assert node.type is compact.nodes[1].type
+    # params are decoded on every read, so stored nodes can't be mutated
+    node.params["message"] = "changed"
+    assert node.params == {"message": "node 0"}
+    assert compact.nodes[-1].params == {}
+
+
+def test_compact_wide_integers():
+    # orjson rejects integers wider than 64 bits; they fall back to json
+    wide = {"id": "w", "type": "add", "params": {"a": 2**70, "b": -(2**65)}}
+    compact = CompactWorkflow.from_model(Workflow(id="wide", name="Wide", nodes=[wide]))
+    assert compact.nodes[0].params == {"a": 2**70, "b": -(2**65)}
+    assert json.loads(compact.to_json())["nodes"][0] == wide
+
+
+def test_compact_uses_less_memory():
+    def traced(build):
+        tracemalloc.start()
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return result, size
+
+    model, model_size = traced(lambda: make_workflow(5000))
+    _, compact_size = traced(lambda: CompactWorkflow.from_model(model))
+    assert compact_size * 2 < model_size
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+from app import main
+from app.main import RUNS, Run, app
+from app.runlogs import RunLog, RunLogStore
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+
+def test_run_log_segments_and_retention(tmp_path):
+    log = RunLog(tmp_path / "run", segment_bytes=64)
+    log.extend(f"line {i}" for i in range(50))
+    log.append("multi\nline ünïcode")
+    assert len(log) == 51
+    assert len(list((tmp_path / "run").glob("*.log"))) > 1
+    assert log.read(9, 3) == ["line 9", "line 10", "line 11"]
+    assert log.read(50, 10) == ["multi\nline ünïcode"]
+    log.close()
+
+    # a torn line at the tail is dropped when the log is reopened
+    last = sorted((tmp_path / "run").glob("*.idx"))[-1]
+    with last.open("ab") as fh:
+        fh.write((10**9).to_bytes(8, sys.byteorder))
+    reopened = RunLog(tmp_path / "run", segment_bytes=64, max_segments=2)
+    assert len(reopened) == 51
+    reopened.extend(f"more {i}" for i in range(20))
+    # only the newest two segments are kept
+    assert reopened.start > 0
+    assert list(reopened)[-1] == "more 19"
+    assert reopened.read(0, 1) == reopened.read(reopened.start, 1)
+    reopened.close()
+
+    store = RunLogStore(tmp_path, retention=60)
+    old = time.time() - 120
+    for path in (tmp_path / "run").iterdir():
+        os.utime(path, (old, old))
+    assert store.cleanup(keep=["run"]) == []
+    assert store.cleanup() == ["run"]
+    assert not store.exists("run")
+
+
+def test_run_logs_endpoint():
+    run = Run(id="run_logs", workflow_id="wf", status="running")
+    RUNS[run.id] = run
+    run.logs.extend(f"line {i}" for i in range(5))
+
+    res = client.get("/runs/run_logs/logs?offset=1&limit=2", headers=HEADERS)
+    assert res.json() == {
+        "run_id": "run_logs",
+        "offset": 1,
+        "next_offset": 3,
+        "lines": ["line 1", "line 2"],
+        "finished": False,
+    }
+    assert client.get("/runs/missing/logs", headers=HEADERS).status_code == 404
+
+    async def follow():
+        async def later():
+            await asyncio.sleep(0.05)
+            run.logs.append("line 5")
+
+        asyncio.ensure_future(later())
+        return await main.get_run_logs("run_logs", offset=5, limit=10, follow=True, wait=5)
+
+    page = asyncio.run(follow())
+    assert page["lines"] == ["line 5"]
+    assert page["next_offset"] == 6
+
+    main.finish_run(run, "completed")
+    res = client.get("/runs/run_logs/logs?offset=6&follow=true", headers=HEADERS)
+    assert res.json()["lines"] == []
+    assert res.json()["finished"] is True
@@ -0,0 +1,132 @@
+import asyncio
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app import main
+from app.compact import CompactWorkflow
+from app.main import (
+    app,
+    RUNS,
+    RUN_STATS,
+    RUN_TASKS,
+    TIMERS,
+    WORKFLOWS,
+    Run,
+    Workflow,
+    cancel_run,
+)
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+WORKFLOWS["wf_spin"] = CompactWorkflow.from_model(
+    Workflow(
+        id="wf_spin",
+        name="Spin",
+        nodes=[{"id": "1", "type": "loop", "params": {"count": 10_000_000}}],
+    )
+)
+
+
+def start_run(run: Run):
+    RUNS[run.id] = run
+    main.WORKFLOW_QUEUE.put_nowait(run.id)
+    return main.scale_workers()
+
+
+def test_cancel_running_and_waiting_runs():
+    cancelled = RUN_STATS["cancelled"]
+    running = Run(id="run_spin", workflow_id="wf_spin")
+    waiting = Run(id="run_wait", workflow_id="wf_spin", status="waiting")
+
+    async def scenario():
+        await start_run(running)
+        await asyncio.sleep(0.05)
+        assert running.status == "running"
+        assert await cancel_run(running.id) == {"run_id": "run_spin", "status": "cancelled"}
+        await asyncio.sleep(0.01)
+
+        RUNS[waiting.id] = waiting
+        waiting.wake_at = time.time() + 60
+        main.arm_timer(waiting)
+        await cancel_run(waiting.id)
+
+    asyncio.run(scenario())
+    assert running.id not in RUN_TASKS
+    assert waiting.status == "cancelled"
+    assert waiting.id not in TIMERS
+    assert RUN_STATS["cancelled"] == cancelled + 2
+
+
+def test_run_deadline():
+    timed_out = RUN_STATS["timed_out"]
+    run = Run(id="run_deadline", workflow_id="wf_spin", deadline=time.time() + 0.05)
+
+    async def scenario():
+        await start_run(run)
+        await asyncio.sleep(0.2)
+
+    asyncio.run(scenario())
+    assert run.status == "timed_out"
+    assert list(run.logs)[-1] == "Run timed out"
+    assert RUN_STATS["timed_out"] == timed_out + 1
+
+
+def test_cancel_synchronous_and_finished_tasks():
+    cancelled = RUN_STATS["cancelled"]
+
+    async def scenario():
+        execution = asyncio.ensure_future(main.execute_workflow("wf_spin"))
+        await asyncio.sleep(0.02)
+        (run_id,) = [i for i, r in RUNS.items() if r.status == "running" and i in RUN_TASKS]
+        await cancel_run(run_id)
+        with pytest.raises(HTTPException) as exc:
+            await execution
+        assert exc.value.status_code == 409
+        assert RUNS[run_id].status == "cancelled"
+
+        # the run's task already returned after parking the run on a timer
+        parked = Run(id="run_parked", workflow_id="wf_spin", status="waiting")
+        RUNS[parked.id] = parked
+        RUN_TASKS[parked.id] = asyncio.ensure_future(asyncio.sleep(0))
+        await asyncio.sleep(0.01)
+        await cancel_run(parked.id)
+        assert parked.status == "cancelled"
+        RUN_TASKS.pop(parked.id)
+
+    asyncio.run(scenario())
+    assert RUN_STATS["cancelled"] == cancelled + 2
+
+
+def test_cancel_and_timeout_endpoints():
+    res = client.post("/runs/missing/cancel", headers=HEADERS)
+    assert res.status_code == 404
+
+    timed_out = RUN_STATS["timed_out"]
+    res = client.post("/workflows/wf_spin/execute?timeout=0.05", headers=HEADERS)
+    assert res.status_code == 408
+    assert RUNS[res.headers["X-Run-ID"]].status == "timed_out"
+    assert RUN_STATS["timed_out"] == timed_out + 1
+
+    status = client.get("/queue/status", headers=HEADERS).json()
+    assert set(status["runs"]) == {"completed", "failed", "cancelled", "timed_out"}
+
+
+def test_finished_runs_are_evicted(monkeypatch):
+    monkeypatch.setattr(main, "MAX_FINISHED_RUNS", 2)
+    monkeypatch.setattr(main, "FINISHED_RUNS", deque())
+    runs = [Run(id=f"run_done_{i}", workflow_id="wf_spin") for i in range(3)]
+    for run in runs:
+        RUNS[run.id] = run
+        main.finish_run(run, "completed")
+    assert runs[0].id not in RUNS
+    assert runs[1].id in RUNS and runs[2].id in RUNS
+    assert client.get("/runs/run_done_0", headers=HEADERS).status_code == 404
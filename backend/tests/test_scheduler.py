@@ -0,0 +1,99 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import main
+from app.main import app
+from app.scheduler import FairQueue, QueueFull
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+
+def drain(queue: FairQueue):
+    return [queue.get_nowait() for _ in range(queue.qsize())]
+
+
+def test_fair_share_between_tenants():
+    queue = FairQueue(weights={"heavy": 2})
+    for i in range(100):
+        queue.put_nowait(f"batch{i}", "batch")
+    queue.put_nowait("ui0", "ui")
+    queue.put_nowait("ui1", "ui")
+    order = drain(queue)
+    # the interactive tenant isn't stuck behind the batch backlog
+    assert order.index("ui1") < 4
+
+    for i in range(6):
+        queue.put_nowait(f"h{i}", "heavy")
+        queue.put_nowait(f"l{i}", "light")
+    first = drain(queue)[:6]
+    assert sum(item.startswith("h") for item in first) == 4
+
+
+def test_priority_and_limits():
+    queue = FairQueue(max_per_tenant=3)
+    queue.put_nowait("low", "t", priority=0)
+    queue.put_nowait("high", "t", priority=5)
+    queue.put_nowait("low2", "t", priority=0)
+    with pytest.raises(QueueFull):
+        queue.put_nowait("over", "t")
+    queue.put_nowait("requeued", "t", force=True)
+    assert queue.tenant_sizes() == {"t": 4}
+    # discarded items stop counting at once and are skipped lazily
+    assert queue.discard("low")
+    assert not queue.discard("low")
+    assert queue.qsize() == 3
+    assert drain(queue) == ["high", "low2", "requeued"]
+    assert queue.tenant_sizes() == {}
+
+    async def scenario():
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        queue.put_nowait("woken", "t")
+        return await getter
+
+    assert asyncio.run(scenario()) == "woken"
+
+
+def test_enqueue_per_tenant(monkeypatch):
+    monkeypatch.setattr(main, "WORKFLOW_QUEUE", FairQueue(max_per_tenant=1))
+    monkeypatch.setattr(main, "TENANTS", {"acme"})
+    monkeypatch.setattr(main, "TENANT_KEYS", {"globexkey": "globex"})
+    # pretend the pool is saturated so nothing is consumed during the test
+    monkeypatch.setattr(main, "WORKERS", [None] * main.MAX_WORKERS)
+    wf = {"id": "wf_tenant", "name": "Tenant", "nodes": []}
+    client.post("/workflows", json=wf, headers=HEADERS)
+
+    tenant_headers = {**HEADERS, "X-Tenant-ID": "acme"}
+    res = client.post("/workflows/wf_tenant/enqueue?priority=3", headers=tenant_headers)
+    assert res.status_code == 200
+    acme_run = res.json()["run_id"]
+    assert main.RUNS[acme_run].priority == 3
+    res = client.post("/workflows/wf_tenant/enqueue", headers=tenant_headers)
+    assert res.status_code == 429
+    res = client.post("/workflows/wf_tenant/enqueue", headers=HEADERS)
+    assert res.status_code == 200
+
+    status = client.get("/queue/status", headers=HEADERS).json()
+    assert status["tenants"] == {"acme": 1, "default": 1}
+
+    # cancelling a queued run frees its tenant's slot right away
+    client.post(f"/runs/{acme_run}/cancel", headers=HEADERS)
+    assert client.get("/queue/status", headers=HEADERS).json()["queue_size"] == 1
+    res = client.post("/workflows/wf_tenant/enqueue", headers=tenant_headers)
+    assert res.status_code == 200
+
+    # tenants come from the API key or the configured list, not the header alone
+    res = client.post("/workflows/wf_tenant/enqueue", headers={**HEADERS, "X-Tenant-ID": "evil"})
+    assert res.status_code == 403
+    globex = {"Authorization": "Bearer globexkey"}
+    res = client.post("/workflows/wf_tenant/enqueue", headers=globex)
+    assert main.RUNS[res.json()["run_id"]].tenant == "globex"
+    res = client.post("/workflows/wf_tenant/enqueue", headers={**globex, "X-Tenant-ID": "acme"})
+    assert res.status_code == 403
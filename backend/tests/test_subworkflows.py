@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+
+def create(workflow_id: str, nodes):
+    res = client.post(
+        "/workflows",
+        json={"id": workflow_id, "name": workflow_id, "nodes": nodes},
+        headers=HEADERS,
+    )
+    assert res.status_code == 200
+
+
+def test_subworkflow_scopes_inputs_and_outputs():
+    create("wf_sub_double", [
+        {"id": "sum", "type": "add", "params": {"a": 2, "b": 3}},
+        {"id": "check", "type": "condition", "params": {"expression": "x == 7"}},
+    ])
+    create("wf_sub_caller", [
+        {"id": "x", "type": "add", "params": {"a": 3, "b": 4}},
+        {
+            "id": "call",
+            "type": "subworkflow",
+            "params": {
+                "workflow_id": "wf_sub_double",
+                "inputs": {"x": "x"},
+                "outputs": {"total": "sum", "matched": "check"},
+            },
+        },
+        {"id": "after", "type": "condition", "params": {"expression": "total == 5 and matched"}},
+        {"id": "whole", "type": "subworkflow", "params": {"workflow_id": "wf_sub_double"}},
+    ])
+
+    res = client.post("/workflows/wf_sub_caller/execute", headers=HEADERS)
+    assert res.status_code == 200
+    assert res.json()["logs"] == [
+        "3 + 4 = 7",
+        "2 + 3 = 5",
+        "x == 7 -> True",
+        "total == 5 and matched -> True",
+        "2 + 3 = 5",
+        # without inputs the callee doesn't see the caller's context
+        "Condition error: name 'x' is not defined",
+        "x == 7 -> False",
+    ]
+
+    res = client.post("/workflows/wf_sub_caller/validate", headers=HEADERS)
+    assert res.json() == {"valid": True, "errors": []}
+
+
+def test_subworkflow_cycles_are_rejected():
+    create("wf_cycle_a", [
+        {"id": "1", "type": "subworkflow", "params": {"workflow_id": "wf_cycle_b"}},
+        {"id": "2", "type": "subworkflow", "params": {"workflow_id": "wf_cycle_missing"}},
+    ])
+    create("wf_cycle_b", [
+        {"id": "1", "type": "print", "params": {"message": "in b"}},
+        {"id": "2", "type": "subworkflow", "params": {"workflow_id": "wf_cycle_a"}},
+    ])
+
+    res = client.post("/workflows/wf_cycle_a/validate", headers=HEADERS)
+    assert res.json()["errors"] == [
+        "Subworkflow cycle: wf_cycle_a -> wf_cycle_b -> wf_cycle_a",
+        "Unknown subworkflow: wf_cycle_missing",
+    ]
+
+    # the runtime guard stops the cycle instead of recursing forever
+    res = client.post("/workflows/wf_cycle_a/execute", headers=HEADERS)
+    assert res.json()["logs"] == [
+        "in b",
+        "Subworkflow cycle: wf_cycle_a -> wf_cycle_b -> wf_cycle_a",
+        "Workflow not found: wf_cycle_missing",
+    ]
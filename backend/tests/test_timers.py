@@ -0,0 +1,66 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app import main, nodes
+from app.compact import CompactWorkflow
+from app.main import RUNS, TIMERS, Run, Workflow, WORKFLOWS, run_workflow
+from app.timers import TimerScheduler
+
+
+def test_timer_scheduler_fires_in_order():
+    fired = []
+
+    async def on_fire(key: str):
+        fired.append(key)
+
+    async def scenario():
+        timers = TimerScheduler(on_fire)
+        now = time.time()
+        timers.schedule("c", now + 0.06)
+        timers.schedule("a", now + 0.02)
+        timers.schedule("b", now + 0.04)
+        timers.schedule("gone", now + 0.01)
+        timers.cancel("gone")
+        # rescheduling replaces the earlier timer
+        timers.schedule("b", now + 0.08)
+        assert len(timers) == 3
+        await asyncio.sleep(0.15)
+        timers.stop()
+        return len(timers)
+
+    assert asyncio.run(scenario()) == 0
+    assert fired == ["a", "c", "b"]
+
+
+def test_long_delay_suspends_run(monkeypatch):
+    monkeypatch.setattr(nodes, "DELAY_SUSPEND_MS", 20)
+    WORKFLOWS["wf_delay"] = CompactWorkflow.from_model(
+        Workflow(
+            id="wf_delay",
+            name="Delay",
+            nodes=[
+                {"id": "1", "type": "print", "params": {"message": "before"}},
+                {"id": "2", "type": "delay", "params": {"ms": 30}},
+                {"id": "3", "type": "print", "params": {"message": "after"}},
+            ],
+        )
+    )
+    run = Run(id="run_delay", workflow_id="wf_delay")
+    RUNS[run.id] = run
+
+    async def scenario():
+        await run_workflow(run)
+        # the worker is released while the run waits on the timer
+        assert run.status == "waiting"
+        assert run.position == 2
+        assert run.id in TIMERS
+        await asyncio.sleep(0.2)
+        TIMERS.stop()
+
+    asyncio.run(scenario())
+    assert run.status == "completed"
+    assert list(run.logs) == ["before", "delay 30ms", "after"]
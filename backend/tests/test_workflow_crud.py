@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from app.main import app, WORKFLOWS
+from app.main import app, SERIALIZED, WORKFLOWS
 
 client = TestClient(app)
 HEADERS = {"Authorization": "Bearer testtoken"}
@@ -28,3 +28,38 @@ def test_update_and_delete_workflow():
     res = client.delete(f"/workflows/{workflow['id']}", headers=HEADERS)
     assert res.status_code == 200
     assert workflow["id"] not in WORKFLOWS
+
+
+def test_serialized_workflow_cache():
+    workflow = {
+        "id": "cached1",
+        "name": "Cached",
+        "nodes": [{"id": "1", "type": "print", "params": {"message": "hello"}}],
+    }
+    client.post("/workflows", json=workflow, headers=HEADERS)
+    first = client.get("/workflows/cached1", headers=HEADERS)
+    assert first.json() == workflow
+    assert SERIALIZED["cached1"][1] == first.content
+
+    updated = {**workflow, "name": "Recached"}
+    client.put("/workflows/cached1", json=updated, headers=HEADERS)
+    current = client.get("/workflows/cached1", headers=HEADERS)
+    assert current.json()["name"] == "Recached"
+
+    res = client.post("/workflows/cached1/save", headers=HEADERS)
+    assert Path(res.json()["saved"]).read_bytes() == current.content
+
+    client.delete("/workflows/cached1", headers=HEADERS)
+    assert "cached1" not in SERIALIZED
+
+
+def test_workflow_with_wide_integers():
+    wf = {
+        "id": "wide1",
+        "name": "Wide",
+        "nodes": [{"id": "1", "type": "add", "params": {"a": 2**70, "b": 1}}],
+    }
+    assert client.post("/workflows", json=wf, headers=HEADERS).status_code == 200
+    res = client.get("/workflows/wide1", headers=HEADERS)
+    assert res.json() == wf
+    client.delete("/workflows/wide1", headers=HEADERS)
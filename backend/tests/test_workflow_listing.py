@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.main import app
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+
+def create(workflow_id: str, nodes: int = 1):
+    workflow = {
+        "id": workflow_id,
+        "name": workflow_id.upper(),
+        "nodes": [
+            {"id": str(i), "type": "print", "params": {"message": "hi"}}
+            for i in range(nodes)
+        ],
+    }
+    res = client.post("/workflows", json=workflow, headers=HEADERS)
+    assert res.status_code == 200
+
+
+def test_paginated_summary_listing():
+    for workflow_id in ["page_c", "page_a", "page_b", "pager_x"]:
+        create(workflow_id, nodes=3)
+
+    res = client.get(
+        "/workflows?prefix=page_&limit=2&view=summary", headers=HEADERS
+    )
+    assert res.status_code == 200
+    first = res.json()
+    assert [w["id"] for w in first] == ["page_a", "page_b"]
+    assert first[0]["node_count"] == 3
+    assert "nodes" not in first[0]
+    cursor = res.headers["X-Next-Cursor"]
+
+    res = client.get(
+        f"/workflows?prefix=page_&limit=2&cursor={cursor}", headers=HEADERS
+    )
+    second = res.json()
+    assert [w["id"] for w in second] == ["page_c"]
+    assert len(second[0]["nodes"]) == 3
+    assert "X-Next-Cursor" not in res.headers
+
+
+def test_conditional_gets():
+    create("etag_wf")
+    res = client.get("/workflows/etag_wf", headers=HEADERS)
+    etag = res.headers["ETag"]
+    res = client.get(
+        "/workflows/etag_wf", headers={**HEADERS, "If-None-Match": etag}
+    )
+    assert res.status_code == 304
+
+    res = client.get("/workflows?view=summary", headers=HEADERS)
+    list_etag = res.headers["ETag"]
+    res = client.get(
+        "/workflows?view=summary", headers={**HEADERS, "If-None-Match": list_etag}
+    )
+    assert res.status_code == 304
+
+    # any write changes both ETags
+    create("etag_wf", nodes=2)
+    res = client.get(
+        "/workflows/etag_wf", headers={**HEADERS, "If-None-Match": etag}
+    )
+    assert res.status_code == 200
+    assert res.headers["ETag"] != etag
+    res = client.get(
+        "/workflows?view=summary", headers={**HEADERS, "If-None-Match": list_etag}
+    )
+    assert res.status_code == 200
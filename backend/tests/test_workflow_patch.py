@@ -0,0 +1,119 @@
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.compact import CompactWorkflow
+from app.main import app, WORKFLOW_HISTORY, WORKFLOWS, Workflow
+from app.patch import PatchError, apply_patch
+
+client = TestClient(app)
+HEADERS = {"Authorization": "Bearer testtoken"}
+
+
+def test_apply_patch_operations():
+    workflow = CompactWorkflow.from_model(
+        Workflow(
+            id="p",
+            name="Patch",
+            nodes=[
+                {"id": "1", "type": "print", "params": {"message": "a"}},
+                {"id": "2", "type": "add", "params": {"a": 1, "b": 2}},
+            ],
+        )
+    )
+    patched = apply_patch(
+        workflow,
+        [
+            {"op": "test", "path": "/nodes/1/params/a", "value": 1},
+            {"op": "replace", "path": "/nodes/1/params/a", "value": 5},
+            {
+                "op": "add",
+                "path": "/nodes/-",
+                "value": {"id": "3", "type": "loop", "params": {"count": 2}},
+            },
+            {"op": "remove", "path": "/nodes/0/params/message"},
+            {"op": "replace", "path": "/name", "value": "Patched"},
+        ],
+    )
+    assert patched.version == 2
+    assert patched.name == "Patched"
+    assert patched.to_dict()["nodes"] == [
+        {"id": "1", "type": "print", "params": {}},
+        {"id": "2", "type": "add", "params": {"a": 5, "b": 2}},
+        {"id": "3", "type": "loop", "params": {"count": 2}},
+    ]
+
+    with pytest.raises(PatchError):
+        apply_patch(workflow, [{"op": "test", "path": "/nodes/0/type", "value": "add"}])
+    with pytest.raises(PatchError):
+        apply_patch(workflow, [{"op": "remove", "path": "/nodes/7"}])
+
+
+def test_name_patch_shares_nodes():
+    workflow = CompactWorkflow.from_model(
+        Workflow(id="share", name="Share", nodes=[{"id": "1", "type": "print", "params": {}}])
+    )
+    renamed = apply_patch(workflow, [{"op": "replace", "path": "/name", "value": "New"}])
+    assert renamed.nodes is workflow.nodes
+    assert renamed.name == "New" and renamed.version == 2
+
+
+def test_patch_endpoint_versions():
+    workflow = {
+        "id": "patch_wf",
+        "name": "Patch",
+        "nodes": [
+            {"id": str(i), "type": "print", "params": {"message": str(i)}}
+            for i in range(5)
+        ],
+    }
+    client.post("/workflows", json=workflow, headers=HEADERS)
+    res = client.get("/workflows/patch_wf", headers=HEADERS)
+    assert res.headers["X-Workflow-Version"] == "1"
+    before = WORKFLOWS["patch_wf"]
+
+    edit = [{"op": "replace", "path": "/nodes/2/params/message", "value": "edited"}]
+    res = client.patch(
+        "/workflows/patch_wf", json={"version": 1, "operations": edit}, headers=HEADERS
+    )
+    assert res.status_code == 200
+    assert res.json() == {"id": "patch_wf", "version": 2}
+    after = WORKFLOWS["patch_wf"]
+    # unchanged nodes are shared between versions
+    assert after.nodes[0] is before.nodes[0]
+    assert after.nodes[2] is not before.nodes[2]
+    res = client.get("/workflows/patch_wf", headers=HEADERS)
+    assert res.json()["nodes"][2]["params"]["message"] == "edited"
+
+    # integers wider than 64 bits survive a patch and the cached JSON
+    wide = [{"op": "replace", "path": "/nodes/3/params/message", "value": 2**70}]
+    res = client.patch(
+        "/workflows/patch_wf", json={"version": 2, "operations": wide}, headers=HEADERS
+    )
+    assert res.status_code == 200
+    res = client.get("/workflows/patch_wf", headers=HEADERS)
+    assert res.json()["nodes"][3]["params"]["message"] == 2**70
+
+    # a stale version is rejected
+    res = client.patch(
+        "/workflows/patch_wf", json={"version": 1, "operations": edit}, headers=HEADERS
+    )
+    assert res.status_code == 409
+    res = client.patch(
+        "/workflows/patch_wf",
+        json={"version": 3, "operations": [{"op": "remove", "path": "/bogus"}]},
+        headers=HEADERS,
+    )
+    assert res.status_code == 422
+
+    res = client.get("/workflows/patch_wf/versions", headers=HEADERS)
+    assert [v["version"] for v in res.json()] == [1, 2, 3]
+    res = client.get("/workflows/patch_wf/versions/1", headers=HEADERS)
+    assert res.json()["nodes"][2]["params"]["message"] == "2"
+
+    client.delete("/workflows/patch_wf", headers=HEADERS)
+    assert "patch_wf" not in WORKFLOW_HISTORY